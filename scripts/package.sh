@@ -14,6 +14,9 @@ mkdir -p package
 echo "Installing dependencies..."
 uv pip install --target package/ aws-lambda-powertools boto3
 
+# orjson ships a compiled extension, so fetch the wheel for the Lambda runtime
+uv pip install --target package/ --python-platform x86_64-manylinux2014 --python-version 3.12 orjson
+
 # Copy source code
 echo "Copying source code..."
 cp -r src/* package/
@@ -5,15 +5,23 @@ This script simulates Lambda invocations with different fault scenarios
 and shows the structured JSON logs.
 """
 
-import json
+import importlib
+import io
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from lambda_handler import handler
+import lambda_handler
 
 
 class MockLambdaContext:
@@ -32,6 +40,31 @@ class MockLambdaContext:
         self.log_stream_name = f"2026/02/06/[$LATEST]{self.request_id}"
 
 
+class ThreadOutput(io.TextIOBase):
+    """Stdout stand-in that buffers writes per thread while a capture is active"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (self.stream if buffer is None else buffer).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def capture(self, func, *args):
+        """Call func, returning (result, exception, output written during the call)"""
+        self.local.buffer = io.StringIO()
+        try:
+            return func(*args), None, self.local.buffer.getvalue()
+        except Exception as e:
+            return None, e, self.local.buffer.getvalue()
+        finally:
+            self.local.buffer = None
+
+
 def test_scenario(scenario_name: str, num_requests: int = 5):
     """
     Test a specific fault scenario
@@ -44,42 +77,61 @@ def test_scenario(scenario_name: str, num_requests: int = 5):
     print(f"🧪 Testing Scenario: {scenario_name.upper()}")
     print("=" * 80)
 
-    # Set fault scenario in environment
+    # Set fault scenario in environment; the handler resolves it at import time
     os.environ["FAULT_SCENARIO"] = scenario_name
+    importlib.reload(lambda_handler)
 
     results = {"success": 0, "timeout": 0, "error": 0}
 
-    for i in range(num_requests):
-        print(f"Request {i + 1}/{num_requests}")
-        print("-" * 40)
-
-        # Create test event
-        event = {
+    # Create test events
+    events = [
+        {
             "order_id": f"ORD-{scenario_name.upper()}-{i + 1:03d}",
             "user_id": f"USER-{1000 + i}",
         }
+        for i in range(num_requests)
+    ]
 
-        # Create mock context
-        context = MockLambdaContext()
+    # Invoke handler for all events at once so simulated latencies overlap. The
+    # Powertools logger and metrics are shared, so each request's log lines are
+    # captured on its own thread and printed with its result, not interleaved.
+    output = ThreadOutput(sys.stdout)
+    log_handler = lambda_handler.logger.registered_handler
+    log_stream = log_handler.setStream(output)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=num_requests) as executor:
+            futures = [
+                executor.submit(output.capture, lambda_handler.handler, event, MockLambdaContext())
+                for event in events
+            ]
+    finally:
+        sys.stdout = output.stream
+        log_handler.setStream(log_stream)
+
+    for i, future in enumerate(futures):
+        outcome, error, logs = future.result()
 
-        # Invoke handler
-        try:
-            result = handler(event, context)
-            response_body = json.loads(result["body"])
-
-            if result["statusCode"] == 200:
-                results["success"] += 1
-                print(f"✅ SUCCESS: {response_body['message']}")
-            elif result["statusCode"] == 504:
-                results["timeout"] += 1
-                print(f"⏱️  TIMEOUT: {response_body['message']}")
-            else:
-                results["error"] += 1
-                print(f"❌ ERROR: {response_body['message']}")
+        print(f"Request {i + 1}/{num_requests}")
+        print("-" * 40)
+        print(logs, end="")
 
-        except Exception as e:
+        if error is not None:
+            results["error"] += 1
+            print(f"💥 EXCEPTION: {str(error)}")
+            continue
+
+        response_body = json_loads(outcome["body"])
+
+        if outcome["statusCode"] == 200:
+            results["success"] += 1
+            print(f"✅ SUCCESS: {response_body['message']}")
+        elif outcome["statusCode"] == 504:
+            results["timeout"] += 1
+            print(f"⏱️  TIMEOUT: {response_body['message']}")
+        else:
             results["error"] += 1
-            print(f"💥 EXCEPTION: {str(e)}")
+            print(f"❌ ERROR: {response_body['message']}")
 
     # Print summary
     print("\n" + "=" * 80)
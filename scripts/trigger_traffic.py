@@ -4,78 +4,218 @@ Traffic Generator for Demo Checkout Service
 Generates realistic traffic patterns and triggers fault scenarios for incident demonstration.
 """
 
+import asyncio
 import boto3
-import json
+import math
+import sys
 import time
 import argparse
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    from json import dumps as json_dumps, loads as json_loads
 
 lambda_client = boto3.client("lambda")
 
 
-def generate_traffic(
+async def _invoke_checkout(
+    client,
+    semaphore: asyncio.Semaphore,
+    function_name: str,
+    order_id: str,
+    user_id: str,
+    sync: bool = True,
+) -> int:
+    """
+    Invoke the checkout Lambda once, bounded by the shared concurrency semaphore
+
+    Synchronous invokes return the handler's statusCode; asynchronous ones return
+    Lambda's 202 acknowledgement without waiting for the handler to run.
+    """
+    async with semaphore:
+        response = await client.invoke(
+            FunctionName=function_name,
+            InvocationType="RequestResponse" if sync else "Event",
+            Payload=json_dumps({"order_id": order_id, "user_id": user_id}),
+        )
+        if not sync:
+            return response.get("StatusCode", 500)
+
+        async with response["Payload"] as stream:
+            payload = json_loads(await stream.read())
+
+    return payload.get("statusCode", 500)
+
+
+async def _invoke_fanout(
+    client, semaphore: asyncio.Semaphore, function_name: str, batch: List[Dict[str, str]]
+) -> int:
+    """Hand a batch of orders to the tier-1 fan-out Lambda, which invokes checkout per item"""
+    async with semaphore:
+        response = await client.invoke(
+            FunctionName=function_name,
+            InvocationType="Event",
+            Payload=json_dumps({"batch": batch}),
+        )
+
+    return response.get("StatusCode", 500)
+
+
+async def _report_orders(orders: List[Dict[str, str]], tasks: List[asyncio.Task]) -> int:
+    """Print the outcome of a minute's checkout invocations and return its error count"""
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    ts = datetime.now().strftime("%H:%M:%S")
+    errors = 0
+    lines = []
+
+    for order, result in zip(orders, results):
+        order_id = order["order_id"]
+        if isinstance(result, Exception):
+            errors += 1
+            lines.append(f"⚠️  [{ts}] Error invoking Lambda: {result}\n")
+        elif result >= 400:
+            errors += 1
+            lines.append(f"❌ [{ts}] Order {order_id} failed (status={result})\n")
+        elif result == 202:
+            lines.append(f"📨 [{ts}] Order {order_id} queued\n")
+        else:
+            lines.append(f"✅ [{ts}] Order {order_id} succeeded\n")
+
+    sys.stdout.write("".join(lines))
+    return errors
+
+
+async def _report_batches(
+    batches: List[List[Dict[str, str]]], tasks: List[asyncio.Task]
+) -> int:
+    """Print the outcome of a minute's fan-out dispatches and return its error count"""
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    ts = datetime.now().strftime("%H:%M:%S")
+    errors = 0
+    lines = []
+
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception) or result >= 400:
+            errors += len(batch)
+            lines.append(f"⚠️  [{ts}] Error dispatching batch: {result}\n")
+        else:
+            lines.append(
+                f"📦 [{ts}] Dispatched {len(batch)} orders "
+                f"({batch[0]['order_id']}..{batch[-1]['order_id']})\n"
+            )
+
+    sys.stdout.write("".join(lines))
+    return errors
+
+
+async def generate_traffic(
     duration_minutes: int = 10,
     requests_per_minute: int = 10,
     function_name: str = "demo-checkout-service",
+    concurrency: int = 128,
+    fanout: int = 1,
+    fanout_function: Optional[str] = None,
+    sync: bool = True,
 ):
     """
     Generate synthetic traffic to demo app
 
+    Invocations are fired at evenly spaced intervals and run concurrently, so the
+    achieved rate is bounded by `concurrency` rather than by the round-trip time of
+    each call. Results are printed once per minute of traffic.
+
+    With `fanout` > 1, orders are grouped into batches of that size and each batch is
+    sent asynchronously to the tier-1 fan-out Lambda (src/fanout_handler.py), which
+    invokes the checkout function once per order from inside AWS. Per-order outcomes
+    are then only visible in the fan-out function's CloudWatch logs.
+
+    With `sync` disabled, orders are invoked with InvocationType=Event: the driver
+    only waits for Lambda to queue each request, and handler failures show up in
+    the CheckoutFailures metric instead of the error count printed here.
+
     Args:
         duration_minutes: How long to generate traffic
         requests_per_minute: Request rate
         function_name: Lambda function to invoke
+        concurrency: Maximum number of in-flight invocations
+        fanout: Orders per tier-1 fan-out invocation (1 disables fan-out)
+        fanout_function: Fan-out Lambda name, defaults to "<function_name>-fanout"
+        sync: Wait for each checkout response (RequestResponse) instead of queueing (Event)
     """
     print(
         f"🚀 Generating traffic for {duration_minutes} minutes at {requests_per_minute} req/min..."
     )
+    if fanout > 1:
+        fanout_function = fanout_function or f"{function_name}-fanout"
+        print(f"   Fanning out {fanout} orders per invocation via {fanout_function}")
+
+    # Build every order payload up front so the send loop only slices
+    total_requests = round(duration_minutes * requests_per_minute)
+    if total_requests < 1:
+        print("   Nothing to send (duration and rate must both be positive)")
+        return
+    all_orders = [
+        {"order_id": f"ORD-{i:06d}", "user_id": f"USER-{(i % 1000) + 1000}"}
+        for i in range(total_requests)
+    ]
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # One pooled keep-alive connection per in-flight invoke; failures are counted, not retried
+    client_config = AioConfig(
+        max_pool_connections=concurrency,
+        tcp_keepalive=True,
+        retries={"max_attempts": 0},
+        connect_timeout=2,
+        read_timeout=30,
+    )
 
-    end_time = time.time() + (duration_minutes * 60)
-    request_count = 0
-    errors = 0
-
-    while time.time() < end_time:
-        batch_start = time.time()
-
-        for i in range(requests_per_minute):
-            order_id = f"ORD-{request_count:06d}"
-            user_id = f"USER-{(request_count % 1000) + 1000}"
-
-            try:
-                response = lambda_client.invoke(
-                    FunctionName=function_name,
-                    InvocationType="RequestResponse",  # Synchronous for demo
-                    Payload=json.dumps({"order_id": order_id, "user_id": user_id}),
-                )
-
-                payload = json.loads(response["Payload"].read())
-                status = payload.get("statusCode", 500)
+    # Space invocations evenly on the loop's monotonic clock instead of bursting each minute
+    loop = asyncio.get_running_loop()
+    interval = 60.0 / math.ceil(requests_per_minute / fanout)
+    next_fire = loop.time()
 
-                if status >= 400:
-                    errors += 1
-                    print(
-                        f"❌ [{datetime.now().strftime('%H:%M:%S')}] Order {order_id} failed (status={status})"
-                    )
+    request_count = 0
+    reports = []
+
+    session = get_session()
+    async with session.create_client("lambda", config=client_config) as client:
+        while request_count < total_requests:
+            orders = all_orders[request_count : request_count + requests_per_minute]
+            request_count += len(orders)
+
+            if fanout > 1:
+                items = [orders[i : i + fanout] for i in range(0, len(orders), fanout)]
+            else:
+                items = orders
+
+            tasks = []
+            for item in items:
+                delay = next_fire - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                if fanout > 1:
+                    invoke = _invoke_fanout(client, semaphore, fanout_function, item)
                 else:
-                    print(
-                        f"✅ [{datetime.now().strftime('%H:%M:%S')}] Order {order_id} succeeded"
+                    invoke = _invoke_checkout(
+                        client, semaphore, function_name, item["order_id"], item["user_id"], sync
                     )
+                tasks.append(asyncio.create_task(invoke))
+                next_fire += interval
 
-            except Exception as e:
-                errors += 1
-                print(
-                    f"⚠️  [{datetime.now().strftime('%H:%M:%S')}] Error invoking Lambda: {e}"
-                )
+            # Report this minute once its invokes finish, without holding up the pacer
+            if fanout > 1:
+                reports.append(asyncio.create_task(_report_batches(items, tasks)))
+            else:
+                reports.append(asyncio.create_task(_report_orders(items, tasks)))
 
-            request_count += 1
-
-        # Calculate sleep time to maintain rate
-        elapsed = time.time() - batch_start
-        sleep_time = max(0, 60 - elapsed)
-
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        errors = sum(await asyncio.gather(*reports))
 
     error_rate = (errors / request_count * 100) if request_count > 0 else 0
     print(f"\n✅ Traffic generation complete!")
@@ -88,15 +228,24 @@ def trigger_incident_scenario(
     function_name: str = "demo-checkout-service",
     burst_duration_minutes: int = 5,
     burst_rate: int = 30,
+    concurrency: int = 128,
+    fanout: int = 1,
+    sync: bool = False,
 ):
     """
     Trigger a specific fault scenario and generate burst traffic
 
+    Burst traffic is fire-and-forget by default: its purpose is to drive load and
+    produce CloudWatch logs, so the driver doesn't wait on each checkout response.
+
     Args:
         scenario: Fault scenario to activate
         function_name: Lambda function name
         burst_duration_minutes: How long to generate burst traffic
         burst_rate: Requests per minute during burst
+        concurrency: Maximum number of in-flight invocations
+        fanout: Orders per tier-1 fan-out invocation (1 disables fan-out)
+        sync: Wait for each checkout response instead of invoking asynchronously
     """
     print(f"🚨 TRIGGERING INCIDENT SCENARIO: {scenario}")
     print(f"   This will simulate a production incident for demo purposes")
@@ -133,15 +282,22 @@ def trigger_incident_scenario(
     print(f"   Rate: {burst_rate} requests/minute")
     print()
 
-    generate_traffic(
-        duration_minutes=burst_duration_minutes,
-        requests_per_minute=burst_rate,
-        function_name=function_name,
+    asyncio.run(
+        generate_traffic(
+            duration_minutes=burst_duration_minutes,
+            requests_per_minute=burst_rate,
+            function_name=function_name,
+            concurrency=concurrency,
+            fanout=fanout,
+            sync=sync,
+        )
     )
 
     print(f"\n🎯 INCIDENT SCENARIO COMPLETE!")
     print(f"   Scenario '{scenario}' is now active and generating errors")
     print(f"   Check CloudWatch Logs: /aws/lambda/{function_name}")
+    if not sync:
+        print("   Failure counts: CheckoutFailures metric in the DemoApp namespace")
     print(f"   Ready to trigger Incident Commander for investigation")
 
 
@@ -161,6 +317,14 @@ def reset_to_normal(function_name: str = "demo-checkout-service"):
         print(f"❌ Failed to reset: {e}")
 
 
+def _positive_int(value: str) -> int:
+    """argparse type for options that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Traffic generator for demo checkout service"
@@ -176,19 +340,50 @@ if __name__ == "__main__":
         choices=["db_pool_exhaustion", "memory_leak", "cascading_failure"],
         help="Fault scenario to trigger (incident mode only)",
     )
-    parser.add_argument("--duration", type=int, default=10, help="Duration in minutes")
-    parser.add_argument("--rate", type=int, default=10, help="Requests per minute")
+    parser.add_argument("--duration", type=_positive_int, default=10, help="Duration in minutes")
+    parser.add_argument("--rate", type=_positive_int, default=10, help="Requests per minute")
     parser.add_argument(
         "--function", default="demo-checkout-service", help="Lambda function name"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=_positive_int,
+        default=128,
+        help="Maximum in-flight Lambda invocations",
+    )
+    parser.add_argument(
+        "--fanout",
+        type=_positive_int,
+        default=1,
+        help="Orders per invocation of the tier-1 fan-out Lambda (1 = invoke checkout directly)",
+    )
+    invocation = parser.add_mutually_exclusive_group()
+    invocation.add_argument(
+        "--sync",
+        dest="sync",
+        action="store_true",
+        default=None,
+        help="Wait for each checkout response (default for traffic mode)",
+    )
+    invocation.add_argument(
+        "--async",
+        dest="sync",
+        action="store_false",
+        help="Queue invocations without waiting for responses (default for incident mode)",
+    )
 
     args = parser.parse_args()
 
     if args.mode == "traffic":
-        generate_traffic(
-            duration_minutes=args.duration,
-            requests_per_minute=args.rate,
-            function_name=args.function,
+        asyncio.run(
+            generate_traffic(
+                duration_minutes=args.duration,
+                requests_per_minute=args.rate,
+                function_name=args.function,
+                concurrency=args.concurrency,
+                fanout=args.fanout,
+                sync=args.sync is not False,
+            )
         )
     elif args.mode == "incident":
         trigger_incident_scenario(
@@ -196,6 +391,9 @@ if __name__ == "__main__":
             function_name=args.function,
             burst_duration_minutes=args.duration,
             burst_rate=args.rate,
+            concurrency=args.concurrency,
+            fanout=args.fanout,
+            sync=args.sync is True,
         )
     elif args.mode == "reset":
         reset_to_normal(function_name=args.function)
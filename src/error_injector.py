@@ -5,12 +5,17 @@ This module provides various error types beyond database issues to demonstrate
 comprehensive error handling and RCA capabilities.
 """
 
-from aws_lambda_powertools import Logger, Metrics
-from aws_lambda_powertools.metrics import MetricUnit
 import random
 
-logger = Logger()
-metrics = Metrics()
+if __package__:
+    from .observability import logger, metrics
+else:  # Deployed flat (handler "lambda_handler.handler"), not as a package
+    from observability import logger, metrics  # type: ignore[no-redef, import-not-found]
+
+# Fixed choice pools for the injectors below
+_INVALID_FIELDS = ("total_amount", "customer_email", "shipping_address")
+_SERVICES = ("inventory-api", "shipping-calculator", "tax-service")
+_rand = random.Random()
 
 
 def inject_payment_api_error(order_id: str, user_id: str, scenario: str):
@@ -28,14 +33,13 @@ def inject_payment_api_error(order_id: str, user_id: str, scenario: str):
             "error_message": "Service Unavailable - Payment processor down",
         },
     )
-    metrics.add_metric(name="APIErrors", unit=MetricUnit.Count, value=1)
+    metrics.add_metric(name="APIErrors", unit="Count", value=1)
     raise Exception("Payment gateway unavailable - Service temporarily down")
 
 
 def inject_validation_error(order_id: str, user_id: str, scenario: str):
     """Simulate input validation failure"""
-    invalid_fields = ["total_amount", "customer_email", "shipping_address"]
-    field = random.choice(invalid_fields)
+    field = _rand.choice(_INVALID_FIELDS)
 
     logger.error(
         "Order validation failed",
@@ -48,7 +52,7 @@ def inject_validation_error(order_id: str, user_id: str, scenario: str):
             "fault_scenario": scenario,
         },
     )
-    metrics.add_metric(name="ValidationErrors", unit=MetricUnit.Count, value=1)
+    metrics.add_metric(name="ValidationErrors", unit="Count", value=1)
     raise ValueError(f"Validation failed: {field} has invalid value")
 
 
@@ -66,14 +70,13 @@ def inject_memory_error(order_id: str, user_id: str, scenario: str):
             "context": "Processing large batch order with 10000+ items",
         },
     )
-    metrics.add_metric(name="MemoryErrors", unit=MetricUnit.Count, value=1)
+    metrics.add_metric(name="MemoryErrors", unit="Count", value=1)
     raise MemoryError("Cannot allocate memory for large order processing")
 
 
 def inject_external_api_timeout(order_id: str, user_id: str, scenario: str):
     """Simulate external service timeout"""
-    services = ["inventory-api", "shipping-calculator", "tax-service"]
-    service = random.choice(services)
+    service = _rand.choice(_SERVICES)
 
     logger.error(
         f"{service} timeout",
@@ -87,7 +90,7 @@ def inject_external_api_timeout(order_id: str, user_id: str, scenario: str):
             "endpoint": f"https://{service}.internal/api/v1/check",
         },
     )
-    metrics.add_metric(name="ExternalTimeouts", unit=MetricUnit.Count, value=1)
+    metrics.add_metric(name="ExternalTimeouts", unit="Count", value=1)
     raise TimeoutError(f"{service} did not respond within timeout period")
 
 
@@ -0,0 +1,64 @@
+"""
+Tier-1 fan-out Lambda for the traffic generator
+
+Receives one payload carrying a batch of order/user tuples from scripts/trigger_traffic.py
+and invokes the checkout Lambda once per item in parallel from inside AWS, so the
+traffic driver sends one request per batch instead of one per order.
+"""
+
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+import json
+import os
+from typing import Dict, Any
+
+MAX_FANOUT = int(os.getenv("MAX_FANOUT", "64"))
+TARGET_FUNCTION_NAME = os.getenv("TARGET_FUNCTION_NAME", "demo-checkout-service")
+
+logger = Logger(service="checkout-traffic-fanout")
+
+# Reused across warm invocations; the pool is sized so every worker gets its own connection
+lambda_client = boto3.client("lambda", config=Config(max_pool_connections=MAX_FANOUT))
+executor = ThreadPoolExecutor(max_workers=MAX_FANOUT)
+
+
+def invoke_checkout(item: Dict[str, Any]) -> int:
+    """Invoke the checkout Lambda for a single order and return its status code"""
+    try:
+        response = lambda_client.invoke(
+            FunctionName=TARGET_FUNCTION_NAME,
+            InvocationType="RequestResponse",
+            Payload=json.dumps(item),
+        )
+        payload = json.loads(response["Payload"].read())
+        return int(payload.get("statusCode", 500))
+
+    except Exception:
+        logger.exception("Failed to invoke checkout Lambda", extra={"order": item})
+        return 500
+
+
+@logger.inject_lambda_context
+def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """
+    Lambda handler for fan-out batches
+
+    Expects an event of the form {"batch": [{"order_id": ..., "user_id": ...}, ...]}.
+    """
+    batch = event.get("batch", [])
+    statuses = list(executor.map(invoke_checkout, batch))
+    errors = sum(1 for status in statuses if status >= 400)
+
+    logger.info(
+        "Fan-out batch complete",
+        extra={
+            "target_function": TARGET_FUNCTION_NAME,
+            "batch_size": len(batch),
+            "errors": errors,
+        },
+    )
+
+    return {"invoked": len(batch), "errors": errors}
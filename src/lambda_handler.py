@@ -5,216 +5,342 @@ Simulates a realistic checkout service with fault injection for incident demonst
 Logs structured JSON to CloudWatch for analysis by Incident Commander.
 """
 
-from aws_lambda_powertools import Logger, Tracer, Metrics
-from aws_lambda_powertools.metrics import MetricUnit
-from aws_lambda_powertools.utilities.typing import LambdaContext
+import functools
+import itertools
+import logging
 import random
+import re
 import time
 import os
 import json
-from datetime import datetime
-from typing import Dict, Any
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Tuple
 
-# Initialize AWS Lambda Powertools
-logger = Logger(service="checkout-service")
-tracer = Tracer(service="checkout-service")
-metrics = Metrics(namespace="DemoApp", service="checkout-service")
+if TYPE_CHECKING:
+    from aws_lambda_powertools.utilities.typing import LambdaContext
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:  # Fall back to the stdlib encoder when orjson isn't packaged
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+
+# Shared AWS Lambda Powertools logger and metrics
+if __package__:
+    from .observability import logger, metrics
+else:  # Deployed flat (handler "lambda_handler.handler"), not as a package
+    from observability import logger, metrics  # type: ignore[no-redef, import-not-found]
+
+# Bound once to skip the attribute lookup per metric; POWERTOOLS_METRICS_DISABLED
+# is left to Powertools, which then skips the flush like it does for error_injector
+_add_metric = metrics.add_metric
+
+# The ColdStart metric is opt-in; without it log_metrics skips the extra EMF record
+_EMIT_COLD_START = os.getenv("EMIT_COLDSTART") == "1"
+
+# Logging the full incoming event is opt-in for the same reason
+_LOG_EVENT = os.getenv("LOG_EVENT") == "1"
+
+# Only set up X-Ray tracing where a daemon is available; local and test runs skip
+# importing and initializing the Tracer, and its decorators become no-ops
+_TRACING_ENABLED = os.getenv("AWS_XRAY_DAEMON_ADDRESS") is not None
+
+_Decorator = Callable[[Callable[..., Any]], Callable[..., Any]]
+
+
+def _identity(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Stand-in for tracer decorators when tracing is off"""
+    return func
+
+
+if _TRACING_ENABLED:
+    from aws_lambda_powertools import Tracer
+
+    tracer = Tracer(service="checkout-service")
+
+_capture_method: _Decorator = tracer.capture_method if _TRACING_ENABLED else _identity
+_capture_lambda_handler: _Decorator = (
+    tracer.capture_lambda_handler if _TRACING_ENABLED else _identity
+)
+
+# Private generator, with its methods bound once to skip attribute lookups per request
+_rng = random.Random()
+_random = _rng.random
+_randrange = _rng.randrange
+
+# Hot-path callables bound once for the same reason
+_sleep = time.sleep
+_time = time.time
+
+# Invocations served by this container (resets on cold start); next() on
+# itertools.count is atomic, so concurrent local invocations don't lose counts
+_INVOCATION_COUNTER = itertools.count(1)
+
+# Order IDs are restricted to JSON-safe characters so they can be substituted verbatim
+_ORDER_ID_RE = re.compile(r"[A-Za-z0-9_-]+")
+
+# Fixed-shape response bodies, compact like _dumps output; only error messages
+# still need JSON-encoding
+_SUCCESS_BODY = '{"order_id":"%s","status":"completed","message":"Checkout successful"}'
+_TIMEOUT_BODY = '{"error":"Gateway Timeout","message":%s,"order_id":"%s"}'
+_ERROR_BODY = '{"error":"Internal Server Error","message":%s,"order_id":"%s"}'
+_BAD_REQUEST_BODY = (
+    '{"error":"Bad Request","message":"order_id may only contain letters, digits, - and _"}'
+)
+
+
+class FaultCfg(NamedTuple):
+    """Fault injection settings for a single scenario"""
+
+    db_timeout_rate: float
+    slow_query_rate: float
+    exception_rate: float
+    db_pool_size: int
+    concurrent_calls: int
+    query_duration_ms: int
+    timeout_ms: int
+    deployment_time_offset_mins: Optional[int] = None
+    additional_latency_ms: int = 0
 
 
 class FaultInjector:
     """Manages fault injection scenarios"""
 
     # Fault injection scenarios
-    FAULT_SCENARIOS = {
-        "normal": {
-            "db_timeout_rate": 0.05,
-            "slow_query_rate": 0.10,
-            "exception_rate": 0.05,
-            "db_pool_size": 10,
-            "concurrent_calls": 1,
-            "query_duration_ms": 150,
-            "timeout_ms": 5000,
-        },
-        "db_pool_exhaustion": {
-            "db_timeout_rate": 0.50,
-            "slow_query_rate": 0.30,
-            "exception_rate": 0.00,
-            "db_pool_size": 3,
-            "concurrent_calls": 5,
-            "query_duration_ms": 150,
-            "timeout_ms": 5000,
-        },
-        "deployment_config_bug": {
+    FAULT_SCENARIOS: Dict[str, FaultCfg] = {
+        "normal": FaultCfg(
+            db_timeout_rate=0.05,
+            slow_query_rate=0.10,
+            exception_rate=0.05,
+            db_pool_size=10,
+            concurrent_calls=1,
+            query_duration_ms=150,
+            timeout_ms=5000,
+        ),
+        "db_pool_exhaustion": FaultCfg(
+            db_timeout_rate=0.50,
+            slow_query_rate=0.30,
+            exception_rate=0.00,
+            db_pool_size=3,
+            concurrent_calls=5,
+            query_duration_ms=150,
+            timeout_ms=5000,
+        ),
+        "deployment_config_bug": FaultCfg(
             # Simulates bad config deployed 15 mins ago
             # Symptoms: 40% timeout rate + 2000ms latency spikes
-            "db_timeout_rate": 0.40,
-            "slow_query_rate": 0.40,
-            "exception_rate": 0.10,
-            "db_pool_size": 5,  # Config changed from 10 → 5 (bad!)
-            "concurrent_calls": 8,  # Load increased but pool decreased
-            "query_duration_ms": 2000,  # Latency spike to 2000ms
-            "timeout_ms": 3000,  # Aggressive timeout
-            "deployment_time_offset_mins": 15,  # Triggered 15 mins after deploy
-        },
-        "memory_leak": {
-            "db_timeout_rate": 0.10,
-            "slow_query_rate": 0.20,
-            "exception_rate": 0.15,
-            "db_pool_size": 10,
-            "concurrent_calls": 1,
-            "query_duration_ms": 300,
-            "timeout_ms": 5000,
-        },
-        "cascading_failure": {
-            "db_timeout_rate": 0.70,
-            "slow_query_rate": 0.20,
-            "exception_rate": 0.10,
-            "db_pool_size": 2,
-            "concurrent_calls": 10,
-            "query_duration_ms": 500,
-            "timeout_ms": 2000,
-        },
+            db_timeout_rate=0.40,
+            slow_query_rate=0.40,
+            exception_rate=0.10,
+            db_pool_size=5,  # Config changed from 10 → 5 (bad!)
+            concurrent_calls=8,  # Load increased but pool decreased
+            query_duration_ms=2000,  # Latency spike to 2000ms
+            timeout_ms=3000,  # Aggressive timeout
+            deployment_time_offset_mins=15,  # Triggered 15 mins after deploy
+        ),
+        "memory_leak": FaultCfg(
+            db_timeout_rate=0.10,
+            slow_query_rate=0.20,
+            exception_rate=0.15,
+            db_pool_size=10,
+            concurrent_calls=1,
+            query_duration_ms=300,
+            timeout_ms=5000,
+        ),
+        "cascading_failure": FaultCfg(
+            db_timeout_rate=0.70,
+            slow_query_rate=0.20,
+            exception_rate=0.10,
+            db_pool_size=2,
+            concurrent_calls=10,
+            query_duration_ms=500,
+            timeout_ms=2000,
+        ),
     }
 
     @staticmethod
     def get_active_scenario() -> str:
         """Get current fault scenario from environment"""
-        return os.getenv("FAULT_SCENARIO", "normal")
+        return _ACTIVE_SCENARIO
 
     @staticmethod
-    def get_fault_config() -> Dict[str, float]:
+    def get_fault_config() -> FaultCfg:
         """Get fault injection configuration for active scenario"""
-        scenario = FaultInjector.get_active_scenario()
-        config = FaultInjector.FAULT_SCENARIOS.get(
-            scenario, FaultInjector.FAULT_SCENARIOS["normal"]
-        )
+        # Static scenarios share one immutable config for the container's lifetime
+        if not _DEGRADES_OVER_TIME:
+            return _ACTIVE_CONFIG
 
-        # For memory leak, calculate dynamic latency
-        if scenario == "memory_leak":
-            invocation_count = FaultInjector._get_invocation_count()
-            degradation_factor = min(invocation_count / 100, 5.0)
-            config["additional_latency_ms"] = int(100 * degradation_factor)
+        # For memory leak, calculate dynamic latency on a copy of the shared config
+        invocation_count = FaultInjector._get_invocation_count()
+        degradation_factor = min(invocation_count / 100, 5.0)
+        return _ACTIVE_CONFIG._replace(additional_latency_ms=int(100 * degradation_factor))
 
-        return config
+    @staticmethod
+    def get_thresholds(scenario: str) -> Tuple[float, float, float]:
+        """Get cumulative (timeout, slow query, exception) thresholds for a scenario"""
+        return _SCENARIO_THRESHOLDS.get(scenario, _SCENARIO_THRESHOLDS["normal"])
 
     @staticmethod
     def _get_invocation_count() -> int:
         """Track invocation count for memory leak simulation"""
-        count_file = "/tmp/invocation_count.txt"
-        count = 0
-
-        try:
-            if os.path.exists(count_file):
-                with open(count_file) as f:
-                    count = int(f.read().strip())
-        except Exception:
-            pass
+        return next(_INVOCATION_COUNTER)
 
-        count += 1
 
-        try:
-            with open(count_file, "w") as f:
-                f.write(str(count))
-        except Exception:
-            pass
+# Cumulative fault thresholds for every scenario, summed once at import
+_SCENARIO_THRESHOLDS: Dict[str, Tuple[float, float, float]] = {
+    name: (
+        config.db_timeout_rate,
+        config.db_timeout_rate + config.slow_query_rate,
+        config.db_timeout_rate + config.slow_query_rate + config.exception_rate,
+    )
+    for name, config in FaultInjector.FAULT_SCENARIOS.items()
+}
+
+# Fault classes returned by a scenario's classifier
+_DB_TIMEOUT, _SLOW_QUERY, _EXCEPTION, _NORMAL = range(4)
+
+
+def _build_classifier(thresholds: Tuple[float, float, float]) -> Callable[[float], int]:
+    """Specialize fault classification with a scenario's thresholds bound in a closure"""
+    t_timeout, t_slow, t_exc = thresholds
+
+    def _classify(r: float) -> int:
+        if r < t_timeout:
+            return _DB_TIMEOUT
+        if r < t_slow:
+            return _SLOW_QUERY
+        if r < t_exc:
+            return _EXCEPTION
+        return _NORMAL
+
+    return _classify
+
+
+# Environment variables are fixed for the lifetime of an execution environment
+# (a configuration update starts new ones), so resolve the scenario once at import
+_ACTIVE_SCENARIO = os.getenv("FAULT_SCENARIO", "normal")
+_ACTIVE_CONFIG = FaultInjector.FAULT_SCENARIOS.get(
+    _ACTIVE_SCENARIO, FaultInjector.FAULT_SCENARIOS["normal"]
+)
+_ACTIVE_THRESHOLDS = FaultInjector.get_thresholds(_ACTIVE_SCENARIO)
+_DEGRADES_OVER_TIME = _ACTIVE_SCENARIO == "memory_leak"
+
+# Timeout log fields that are fixed for the active scenario (memory leak only
+# varies latency, not the pool), merged with the per-request fields on each timeout
+_TIMEOUT_EXTRA_BASE = {
+    "error_type": "TimeoutError",
+    "database": "orders_db",
+    "db_pool_size": _ACTIVE_CONFIG.db_pool_size,
+    "concurrent_calls": _ACTIVE_CONFIG.concurrent_calls,
+    "pool_available": _ACTIVE_CONFIG.db_pool_size - _ACTIVE_CONFIG.concurrent_calls,
+}
+_classify = _build_classifier(_ACTIVE_THRESHOLDS)
+_ANY_FAULTS = _ACTIVE_THRESHOLDS[2] > 0
+
+# Bind per-container fields once so they are attached to every log line
+# without rebuilding them into each call's extra dict
+logger.append_keys(
+    fault_scenario=_ACTIVE_SCENARIO,
+    service_version=os.getenv("AWS_LAMBDA_FUNCTION_VERSION"),
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _deployment_info(offset_mins: Optional[int], bucket: int) -> Dict[str, Any]:
+    """
+    Build deployment correlation fields for a scenario
 
-        return count
+    Cached per one-second `bucket` so the deployment timestamp still advances
+    without being recomputed on every request.
+    """
+    if not offset_mins:
+        return {}
+
+    deploy_time = datetime.now() - timedelta(minutes=offset_mins)
+    return {
+        "possibly_deployment_related": True,
+        "recent_deployment_time": deploy_time.isoformat(),
+        "minutes_since_deployment": offset_mins,
+    }
 
 
-@tracer.capture_method
-def simulate_database_query(order_id: str, user_id: str) -> Dict[str, Any]:
+@_capture_method
+def simulate_database_query(
+    order_id: str, user_id: str, counters: Dict[str, int]
+) -> Dict[str, Any]:
     """
     Simulates database query with realistic fault injection
 
     Args:
         order_id: Order identifier
         user_id: User identifier
+        counters: Per-request metric counts, emitted once by the handler
 
     Returns:
         Query result or raises exception
     """
     fault_config = FaultInjector.get_fault_config()
-    scenario = FaultInjector.get_active_scenario()
 
     # Get DB pool configuration (needed for timeout error reporting)
-    db_pool_size = fault_config.get("db_pool_size", 10)
-    concurrent_calls = fault_config.get("concurrent_calls", 1)
-    base_query_duration = fault_config.get("query_duration_ms", 150)
-    timeout_threshold = fault_config.get("timeout_ms", 5000)
-
-    # Determine fault type based on probabilities
-    fault_roll = random.random()
+    db_pool_size = fault_config.db_pool_size
+    concurrent_calls = fault_config.concurrent_calls
+    base_query_duration = fault_config.query_duration_ms
+    timeout_threshold = fault_config.timeout_ms
+
+    # Determine fault type based on probabilities (no roll needed if nothing can fail)
+    if _ANY_FAULTS:
+        fault_type = _classify(_random())
+    else:
+        fault_type = _NORMAL
 
     # Inject database timeout
-    if fault_roll < fault_config.get("db_timeout_rate", 0):
-        query_duration = random.randint(4500, 5500)
+    if fault_type == _DB_TIMEOUT:
         # Simulate waiting for connection from pool
-        query_duration = random.randint(4500, 5500)  # Original query duration for timeout
+        query_duration = _randrange(4500, 5501)  # Original query duration for timeout
         actual_wait_time = timeout_threshold if concurrent_calls > db_pool_size else query_duration
 
         # Check if this is deployment-related
-        deployment_info = {}
-        if fault_config.get("deployment_time_offset_mins"):
-            from datetime import datetime, timedelta
-
-            deploy_time = datetime.now() - timedelta(
-                minutes=fault_config["deployment_time_offset_mins"]
-            )
-            deployment_info = {
-                "possibly_deployment_related": True,
-                "recent_deployment_time": deploy_time.isoformat(),
-                "minutes_since_deployment": fault_config["deployment_time_offset_mins"],
-            }
+        deployment_info = _deployment_info(
+            fault_config.deployment_time_offset_mins, int(_time())
+        )
 
         logger.error(
             "Database connection timeout - pool exhausted",
             extra={
-                "error_type": "TimeoutError",
-                "database": "orders_db",
+                **_TIMEOUT_EXTRA_BASE,
                 "query_duration_ms": query_duration,
                 "wait_time_ms": actual_wait_time,
-                "db_pool_size": db_pool_size,
-                "concurrent_calls": concurrent_calls,
-                "pool_available": db_pool_size - concurrent_calls,
                 "order_id": order_id,
                 "user_id": user_id,
-                "fault_scenario": scenario,
                 **deployment_info,
             },
         )
-        metrics.add_metric(name="db_timeout", unit=MetricUnit.Count, value=1)
-        metrics.add_metric(name="db_pool_exhausted", unit=MetricUnit.Count, value=1)
+        counters["db_timeout"] = 1
         raise TimeoutError(
             f"Database connection timeout after {actual_wait_time}ms waiting for connection. "
             f"Pool size: {db_pool_size}, Concurrent requests: {concurrent_calls}"
         )
 
     # Inject slow query
-    elif fault_roll < fault_config.get("db_timeout_rate", 0) + fault_config.get(
-        "slow_query_rate", 0
-    ):
+    elif fault_type == _SLOW_QUERY:
         # Simulate query duration (with some variance)
-        query_duration = random.randint(
-            int(base_query_duration * 0.8), int(base_query_duration * 1.2)
+        query_duration = _randrange(
+            int(base_query_duration * 0.8), int(base_query_duration * 1.2) + 1
         )
-        time.sleep(query_duration / 1000)
+        _sleep(query_duration * 0.001)
 
         # Check if latency is extremely high (2000ms+)
         is_latency_spike = query_duration >= 2000
 
         # Check deployment correlation
-        deployment_info = {}
-        if fault_config.get("deployment_time_offset_mins"):
-            from datetime import datetime, timedelta
-
-            deploy_time = datetime.now() - timedelta(
-                minutes=fault_config["deployment_time_offset_mins"]
-            )
-            deployment_info = {
-                "possibly_deployment_related": True,
-                "recent_deployment_time": deploy_time.isoformat(),
-                "minutes_since_deployment": fault_config["deployment_time_offset_mins"],
-            }
+        deployment_info = _deployment_info(
+            fault_config.deployment_time_offset_mins, int(_time())
+        )
 
         log_msg = (
             "LATENCY SPIKE - Query took 2000ms+"
@@ -232,7 +358,6 @@ def simulate_database_query(order_id: str, user_id: str) -> Dict[str, Any]:
                     "latency_threshold_exceeded": "2000ms",
                     "query_type": "SELECT",
                     "table": "orders",
-                    "fault_scenario": scenario,
                     **deployment_info,
                 },
             )
@@ -245,19 +370,14 @@ def simulate_database_query(order_id: str, user_id: str) -> Dict[str, Any]:
                     "query_duration_ms": query_duration,
                     "query_type": "SELECT",
                     "table": "orders",
-                    "fault_scenario": scenario,
                 },
             )
 
-        metrics.add_metric(name="SlowQueries", unit=MetricUnit.Count, value=1)
+        counters["SlowQueries"] = 1
         return {"status": "success", "latency": "high", "duration_ms": query_duration}
 
     # Inject unhandled exception
-    elif fault_roll < (
-        fault_config.get("db_timeout_rate", 0)
-        + fault_config.get("slow_query_rate", 0)
-        + fault_config.get("exception_rate", 0)
-    ):
+    elif fault_type == _EXCEPTION:
         logger.error(
             "Unhandled exception in order processing",
             extra={
@@ -265,44 +385,39 @@ def simulate_database_query(order_id: str, user_id: str) -> Dict[str, Any]:
                 "user_id": user_id,
                 "error_type": "NullPointerException",
                 "stack_trace": "at OrderProcessor.validate() line 142",
-                "fault_scenario": scenario,
             },
         )
 
-        metrics.add_metric(name="UnhandledExceptions", unit=MetricUnit.Count, value=1)
+        counters["UnhandledExceptions"] = 1
         raise Exception("NullPointerException: order.paymentMethod is null")
 
     # Normal operation
     else:
-        normal_duration = random.randint(80, 150)
-
-        # Add memory leak latency if applicable
-        additional_latency = fault_config.get("additional_latency_ms", 0)
-        if additional_latency > 0:
-            time.sleep(additional_latency / 1000)
-            normal_duration += additional_latency
+        normal_duration = _randrange(80, 151)
 
-        time.sleep(normal_duration / 1000)
+        # Add memory leak latency if applicable, folded into a single wait
+        normal_duration += fault_config.additional_latency_ms
+        _sleep(normal_duration * 0.001)
 
-        logger.info(
-            "Order processed successfully",
-            extra={
-                "order_id": order_id,
-                "user_id": user_id,
-                "processing_time_ms": normal_duration,
-                "payment_method": "credit_card",
-                "total_amount": round(random.uniform(20.0, 500.0), 2),
-            },
-        )
+        # The order total is only cosmetic log data, so skip drawing it when INFO is off
+        if logger.log_level <= logging.INFO:
+            logger.info(
+                "Order processed successfully",
+                extra={
+                    "order_id": order_id,
+                    "user_id": user_id,
+                    "processing_time_ms": normal_duration,
+                    "total_amount": _randrange(2000, 50001) / 100,
+                },
+            )
 
-        metrics.add_metric(name="SuccessfulOrders", unit=MetricUnit.Count, value=1)
         return {"status": "success", "duration_ms": normal_duration}
 
 
-@logger.inject_lambda_context(log_event=True)
-@tracer.capture_lambda_handler
-@metrics.log_metrics(capture_cold_start_metric=True)
-def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+@logger.inject_lambda_context(log_event=_LOG_EVENT)
+@_capture_lambda_handler
+@metrics.log_metrics(capture_cold_start_metric=_EMIT_COLD_START)
+def handler(event: Dict[str, Any], context: "LambdaContext") -> Dict[str, Any]:
     """
     Lambda handler for checkout requests
 
@@ -310,38 +425,44 @@ def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     Logs structured data to CloudWatch for incident analysis.
     """
 
-    # Extract order details
-    order_id = event.get("order_id", f"ORD-{context.aws_request_id[:8].upper()}")
-    user_id = event.get("user_id", f"USER-{random.randint(1000, 9999)}")
+    # Extract order details, only synthesizing IDs when the event omits them
+    order_id = event.get("order_id")
+    if order_id is None:
+        order_id = "ORD-" + context.aws_request_id[:8].upper()
+    user_id = event.get("user_id")
+    if user_id is None:
+        user_id = f"USER-{_randrange(1000, 10000)}"
 
-    # Log scenario info
-    scenario = FaultInjector.get_active_scenario()
+    if not isinstance(order_id, str) or not _ORDER_ID_RE.fullmatch(order_id):
+        logger.warning("Rejected checkout request with invalid order_id")
+        _add_metric(name="InvalidRequests", unit="Count", value=1)
+        return {"statusCode": 400, "body": _BAD_REQUEST_BODY}
+
+    # Log request info (fault_scenario is already bound to the logger)
     logger.info(
         "Processing checkout request",
         extra={
             "order_id": order_id,
             "user_id": user_id,
             "request_id": context.aws_request_id,
-            "fault_scenario": scenario,
             "function_version": context.function_version,
         },
     )
 
+    # Count metrics locally and emit them together once the request is done
+    counters: Dict[str, int] = {}
+
     try:
         # Simulate database operation
-        result = simulate_database_query(order_id, user_id)
+        result = simulate_database_query(order_id, user_id, counters)
 
         # Record success metric
-        metrics.add_metric(name="CheckoutRequests", unit=MetricUnit.Count, value=1)
-        metrics.add_metric(
-            name="ProcessingTime", unit=MetricUnit.Milliseconds, value=result.get("duration_ms", 0)
-        )
+        counters["CheckoutRequests"] = 1
+        _add_metric(name="ProcessingTime", unit="Milliseconds", value=result.get("duration_ms", 0))
 
-        return {
+        response = {
             "statusCode": 200,
-            "body": json.dumps(
-                {"order_id": order_id, "status": "completed", "message": "Checkout successful"}
-            ),
+            "body": _SUCCESS_BODY % order_id,
         }
 
     except TimeoutError as e:
@@ -350,13 +471,11 @@ def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
             extra={"order_id": order_id, "user_id": user_id, "error_type": "TimeoutError"},
         )
 
-        metrics.add_metric(name="CheckoutFailures", unit=MetricUnit.Count, value=1)
+        counters["CheckoutFailures"] = 1
 
-        return {
+        response = {
             "statusCode": 504,
-            "body": json.dumps(
-                {"error": "Gateway Timeout", "message": str(e), "order_id": order_id}
-            ),
+            "body": _TIMEOUT_BODY % (_dumps(str(e)), order_id),
         }
 
     except Exception as e:
@@ -365,15 +484,18 @@ def handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
             extra={"order_id": order_id, "user_id": user_id, "error_type": type(e).__name__},
         )
 
-        metrics.add_metric(name="CheckoutFailures", unit=MetricUnit.Count, value=1)
+        counters["CheckoutFailures"] = 1
 
-        return {
+        response = {
             "statusCode": 500,
-            "body": json.dumps(
-                {"error": "Internal Server Error", "message": str(e), "order_id": order_id}
-            ),
+            "body": _ERROR_BODY % (_dumps(str(e)), order_id),
         }
 
+    for name, value in counters.items():
+        _add_metric(name=name, unit="Count", value=value)
+
+    return response
+
 
 # For local testing
 if __name__ == "__main__":
@@ -0,0 +1,11 @@
+"""
+Shared AWS Lambda Powertools objects for the checkout service
+
+Both lambda_handler and error_injector log and emit metrics through these
+instances, so they share one service/namespace and one metrics buffer.
+"""
+
+from aws_lambda_powertools import Logger, Metrics
+
+logger = Logger(service="checkout-service")
+metrics = Metrics(namespace="DemoApp", service="checkout-service")
@@ -33,3 +33,7 @@ output "function_arn" {
 output "log_group_name" {
   value = module.lambda.log_group_name
 }
+
+output "fanout_function_name" {
+  value = module.lambda.fanout_function_name
+}
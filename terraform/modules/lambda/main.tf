@@ -52,6 +52,87 @@ resource "aws_cloudwatch_log_group" "lambda_logs" {
   retention_in_days = 1  # Cost saving for demo
 }
 
+# Tier-1 fan-out Lambda used by scripts/trigger_traffic.py --fanout
+# Receives batches of orders and invokes the checkout function once per order
+resource "aws_lambda_function" "traffic_fanout" {
+  function_name = "${var.function_name}-fanout"
+  role          = aws_iam_role.fanout_exec.arn
+  
+  filename         = "${path.module}/../../../lambda-package.zip"
+  source_code_hash = filebase64sha256("${path.module}/../../../lambda-package.zip")
+  
+  runtime       = "python3.12"
+  handler       = "fanout_handler.handler"
+  timeout       = var.timeout
+  memory_size   = var.memory_size
+  
+  environment {
+    variables = {
+      TARGET_FUNCTION_NAME = aws_lambda_function.demo_checkout.function_name
+    }
+  }
+  
+  logging_config {
+    log_format = "JSON"
+    log_group  = aws_cloudwatch_log_group.fanout_logs.name
+  }
+  
+  layers = [
+    "arn:aws:lambda:${data.aws_region.current.name}:017000801446:layer:AWSLambdaPowertoolsPythonV2:59"
+  ]
+}
+
+# Batches arrive as async (Event) invocations; a retry would replay the whole
+# batch and duplicate checkout traffic, so failed batches are dropped instead
+resource "aws_lambda_function_event_invoke_config" "traffic_fanout" {
+  function_name          = aws_lambda_function.traffic_fanout.function_name
+  maximum_retry_attempts = 0
+}
+
+# Separate role so only the fan-out function may invoke the checkout function
+resource "aws_iam_role" "fanout_exec" {
+  name = "${var.function_name}-fanout-exec-role"
+  
+  assume_role_policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = "sts:AssumeRole"
+        Effect = "Allow"
+        Principal = {
+          Service = "lambda.amazonaws.com"
+        }
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "fanout_basic" {
+  role       = aws_iam_role.fanout_exec.name
+  policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
+}
+
+resource "aws_iam_role_policy" "fanout_invoke" {
+  name = "${var.function_name}-fanout-invoke"
+  role = aws_iam_role.fanout_exec.id
+  
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action   = "lambda:InvokeFunction"
+        Effect   = "Allow"
+        Resource = aws_lambda_function.demo_checkout.arn
+      }
+    ]
+  })
+}
+
+resource "aws_cloudwatch_log_group" "fanout_logs" {
+  name              = "/aws/lambda/${var.function_name}-fanout"
+  retention_in_days = 1  # Cost saving for demo
+}
+
 # EventBridge traffic generator DISABLED to avoid IAM permission requirements
 # Requires: events:PutRule, events:PutTargets permissions
 # You can invoke the Lambda manually via Function URL instead
@@ -95,3 +176,7 @@ output "function_arn" {
 output "log_group_name" {
   value = aws_cloudwatch_log_group.lambda_logs.name
 }
+
+output "fanout_function_name" {
+  value = aws_lambda_function.traffic_fanout.function_name
+}
@@ -0,0 +1,23 @@
+"""
+Unit tests for error injection helpers
+"""
+
+import pytest
+from src import error_injector, lambda_handler
+
+
+class TestErrorInjector:
+    """Test suite for error injector module"""
+
+    def test_shares_observability_with_handler(self):
+        """Test error injector imports as a package module and shares the handler's logger"""
+        assert error_injector.logger is lambda_handler.logger
+        assert error_injector.metrics is lambda_handler.metrics
+
+    def test_payment_api_error_records_metric(self):
+        """Test injected payment API errors are counted on the shared metrics buffer"""
+        with pytest.raises(Exception, match="Payment gateway unavailable"):
+            error_injector.inject_payment_api_error("TEST-006", "USER-6666", "normal")
+
+        assert "APIErrors" in lambda_handler.metrics.metric_set
+        lambda_handler.metrics.clear_metrics()
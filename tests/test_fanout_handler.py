@@ -0,0 +1,61 @@
+"""
+Unit tests for tier-1 fan-out Lambda
+"""
+
+import io
+import json
+import os
+from unittest.mock import Mock, patch
+
+# The module builds its boto3 client at import time
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+from src import fanout_handler  # noqa: E402
+
+
+def _invoke_response(status_code: int) -> dict:
+    """Build a Lambda invoke response carrying a checkout status code"""
+    return {"Payload": io.BytesIO(json.dumps({"statusCode": status_code}).encode())}
+
+
+class TestFanoutHandler:
+    """Test suite for fan-out handler function"""
+
+    def test_counts_error_statuses_and_invoke_failures(self):
+        """Test statuses >= 400 and failed invocations are both counted as errors"""
+        outcomes = {
+            "ORD-1": _invoke_response(200),
+            "ORD-2": _invoke_response(504),
+            "ORD-3": _invoke_response(500),
+            "ORD-4": RuntimeError("throttled"),
+        }
+
+        def invoke(**kwargs):
+            outcome = outcomes[json.loads(kwargs["Payload"])["order_id"]]
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        client = Mock()
+        client.invoke.side_effect = invoke
+        event = {"batch": [{"order_id": order_id, "user_id": "USER-1"} for order_id in outcomes]}
+
+        with patch("src.fanout_handler.lambda_client", client):
+            result = fanout_handler.handler(event, Mock())
+
+        assert result == {"invoked": 4, "errors": 3}
+        assert client.invoke.call_count == 4
+        assert all(
+            call.kwargs["InvocationType"] == "RequestResponse"
+            for call in client.invoke.call_args_list
+        )
+
+    def test_empty_batch(self):
+        """Test an event without a batch invokes nothing"""
+        client = Mock()
+
+        with patch("src.fanout_handler.lambda_client", client):
+            result = fanout_handler.handler({}, Mock())
+
+        assert result == {"invoked": 0, "errors": 0}
+        client.invoke.assert_not_called()